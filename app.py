@@ -1,4 +1,5 @@
 import os
+import tempfile
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 import streamlit as st
@@ -11,6 +12,17 @@ import requests
 from bs4 import BeautifulSoup
 import spacy
 import chromadb
+from utils import (
+    CollectionManager,
+    url_collection_name,
+    documents_fingerprint,
+    get_collection_version,
+    set_collection_version,
+    export_collection,
+    retrieve_context,
+    reranker,
+    cache_stats,
+)
 
 # Initialize global variables
 default_url = "https://us-south.ml.cloud.ibm.com"
@@ -54,8 +66,8 @@ st.markdown(f'<style>{css_content}</style>', unsafe_allow_html=True)
 class MiniLML6V2EmbeddingFunction(EmbeddingFunction):
     MODEL = sentence_model
 
-    def __call__(self, texts):
-        return MiniLML6V2EmbeddingFunction.MODEL.encode(texts).tolist()
+    def __call__(self, input):
+        return MiniLML6V2EmbeddingFunction.MODEL.encode(input).tolist()
 
 
 def chromadb_client():
@@ -64,14 +76,39 @@ def chromadb_client():
     return client
 
 
+@st.cache_resource
+def get_collection_manager(_client):
+    return CollectionManager(
+        _client,
+        max_vectors=200_000,
+        snapshot_dir=os.path.join(cache_dir, "snapshots"),
+        embedding_function=MiniLML6V2EmbeddingFunction(),
+    )
+
+
 def clear_collection(collection_name, client):
-    try:
-        collection = client.get_collection(collection_name)
-        if collection:
-            collection.delete()
-            st.sidebar.success("Memory cleared successfully!")
-    except ValueError:
-        pass  # Collection does not exist
+    if get_collection_manager(client).clear(collection_name):
+        st.sidebar.success("Memory cleared successfully!")
+    else:
+        st.sidebar.warning("This page is being answered right now, try again shortly.")
+
+
+def export_snapshot(collection_name, client):
+    collection_manager = get_collection_manager(client)
+    with collection_manager.pin(collection_name), tempfile.TemporaryDirectory() as tmp_dir:
+        collection_manager.restore(collection_name)
+        path = os.path.join(tmp_dir, f"{collection_name}.snapshot")
+        export_collection(collection_name, client, path)
+        with open(path, "rb") as file:
+            return file.read()
+
+
+def import_snapshot(uploaded_file, client):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, uploaded_file.name)
+        with open(path, "wb") as file:
+            file.write(uploaded_file.getbuffer())
+        return get_collection_manager(client).import_snapshot(path)
 
 
 def extract_text(url):
@@ -97,19 +134,32 @@ def split_text_into_sentences(text):
 def create_embedding(url, collection_name, client):
     cleaned_text = extract_text(url)
     cleaned_sentences = split_text_into_sentences(cleaned_text)
-    collection = client.get_or_create_collection(collection_name)
-    collection.upsert(
-        documents=cleaned_sentences,
-        metadatas=[{"source": str(i)} for i in range(len(cleaned_sentences))],
-        ids=[str(i) for i in range(len(cleaned_sentences))]
+    collection = client.get_or_create_collection(
+        collection_name, embedding_function=MiniLML6V2EmbeddingFunction()
     )
-    return collection
-
-
-def create_prompt(url, question, collection_name, client):
-    collection = create_embedding(url, collection_name, client)
-    relevant_chunks = collection.query(query_texts=[question], n_results=5)
-    context = "\n\n\n".join(relevant_chunks["documents"][0])
+    version = documents_fingerprint(cleaned_sentences)
+    if get_collection_version(collection_name) != version:
+        # Drop sentences left over from a longer earlier version of the page
+        stale_ids = [str(i) for i in range(len(cleaned_sentences), collection.count())]
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+        collection.upsert(
+            documents=cleaned_sentences,
+            metadatas=[{"source": str(i)} for i in range(len(cleaned_sentences))],
+            ids=[str(i) for i in range(len(cleaned_sentences))]
+        )
+        set_collection_version(collection_name, version)
+    return collection, version
+
+
+def create_prompt(url, question, collection_name, client, rerank=False):
+    collection_manager = get_collection_manager(client)
+    with collection_manager.pin(collection_name):
+        collection_manager.restore(collection_name)
+        collection, version = create_embedding(url, collection_name, client)
+        collection_manager.touch(collection_name, collection)
+        relevant_chunks = retrieve_context(collection, question, version, MiniLML6V2EmbeddingFunction(), rerank)
+    context = "\n\n\n".join(relevant_chunks)
     return (
         f"<|begin_of_text|>\n"
         f"<|start_header_id|>system<|end_header_id|>\n"
@@ -143,13 +193,13 @@ def get_model(model_type, max_tokens, min_tokens, decoding, temperature, top_k,
     return model
 
 
-def answer_questions_from_web(api_key, project_id, watsonx_url, url, question, collection_name, client):
+def answer_questions_from_web(api_key, project_id, watsonx_url, url, question, collection_name, client, rerank=False):
     st.session_state.api_key = api_key
     st.session_state.watsonx_project_id = project_id
     st.session_state.watsonx_url = watsonx_url
 
     model = get_model("meta-llama/llama-3-70b-instruct", 100, 50, DecodingMethods.GREEDY, 0.7, 50, 1)
-    prompt = create_prompt(url, question, collection_name, client)
+    prompt = create_prompt(url, question, collection_name, client, rerank)
     response = model.generate(prompt=prompt)
     return response['results'][0]['generated_text'].strip()
 
@@ -167,6 +217,9 @@ def main():
     api_key = st.sidebar.text_input("API Key", st.session_state.api_key, type="password")
     project_id = st.sidebar.text_input("Project ID", st.session_state.watsonx_project_id)
     watsonx_url = st.sidebar.text_input("Watsonx URL", st.session_state.watsonx_url)
+    rerank = st.sidebar.checkbox("Re-rank context with a cross-encoder", value=False)
+    if rerank:
+        reranker.warm_up()
 
     if api_key: st.session_state.api_key = api_key
     if project_id: st.session_state.watsonx_project_id = project_id
@@ -175,11 +228,11 @@ def main():
     user_url = st.text_input("Provide a URL")
     question = st.text_area("Question", height=100)
     client = chromadb_client()
-    collection_name = "base"
+    collection_name = url_collection_name(user_url)
 
     if st.button("Answer the question"):
         if st.session_state.api_key and st.session_state.watsonx_project_id and st.session_state.watsonx_url and user_url:
-            response = answer_questions_from_web(api_key, project_id, watsonx_url, user_url, question, collection_name, client)
+            response = answer_questions_from_web(api_key, project_id, watsonx_url, user_url, question, collection_name, client, rerank)
             st.subheader("Response")
             st.write(response)
         else:
@@ -188,6 +241,40 @@ def main():
     if st.sidebar.button("Clean Memory"):
         clear_collection(collection_name, client)
 
+    with st.sidebar.expander("Snapshots"):
+        if st.button("Export snapshot"):
+            try:
+                st.download_button(
+                    "Download snapshot",
+                    export_snapshot(collection_name, client),
+                    file_name=f"{collection_name}.snapshot",
+                )
+            except Exception as e:
+                st.warning(f"Could not export a snapshot, index the URL first: {e}")
+        uploaded_file = st.file_uploader("Snapshot file")
+        if uploaded_file and st.button("Import snapshot"):
+            try:
+                collection = import_snapshot(uploaded_file, client)
+                st.success(f"Imported {collection.count()} records into '{collection.name}'.")
+            except Exception as e:
+                st.error(f"Could not import snapshot: {e}")
+
+    with st.sidebar.expander("Memory usage"):
+        usage = get_collection_manager(client).usage()
+        st.write(
+            f"{usage['collections']} collections, {usage['vectors']} vectors "
+            f"(~{usage['bytes'] / 1024 ** 2:.1f} MiB), {usage['snapshots']} snapshots on disk "
+            f"({usage['snapshot_bytes'] / 1024 ** 2:.1f} MiB)"
+        )
+
+    with st.sidebar.expander("Cache statistics"):
+        for name, stats in cache_stats().items():
+            st.write(
+                f"{name}: {stats['hit_rate']:.0%} hit rate "
+                f"({stats['hits']}/{stats['hits'] + stats['misses']}), "
+                f"{stats['seconds_saved'] * 1000:.0f} ms saved"
+            )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+"""Benchmark answer-context precision and latency of cross-encoder re-ranking.
+
+Runs every question in the labeled fixture through bi-encoder retrieval and
+then through the cross-encoder re-ranker, and compares how many of the
+chunks kept for the prompt are labeled as answering the question.
+
+    python benchmarks/bench_rerank.py [--candidates 20] [--top-k 5] [--budget 0.5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("HF_HOME", os.path.join(ROOT, ".cache"))
+
+from sentence_transformers import SentenceTransformer, util  # noqa: E402
+
+from utils import RERANK_PARAMS, CrossEncoderReranker  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "rerank_fixture.json")
+
+
+def precision_at_k(ranked, relevant, k):
+    return len(set(ranked[:k]) & relevant) / k
+
+
+def reciprocal_rank(ranked, relevant):
+    for rank, index in enumerate(ranked, start=1):
+        if index in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=RERANK_PARAMS["candidates"])
+    parser.add_argument("--top-k", type=int, default=RERANK_PARAMS["top_k"])
+    parser.add_argument("--budget", type=float, default=RERANK_PARAMS["time_budget"])
+    parser.add_argument("--batch-size", type=int, default=RERANK_PARAMS["batch_size"])
+    args = parser.parse_args()
+
+    with open(FIXTURE) as file:
+        fixture = json.load(file)
+    sentences = fixture["sentences"]
+
+    bi_encoder = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    sentence_embeddings = bi_encoder.encode(sentences, convert_to_tensor=True)
+    reranker = CrossEncoderReranker()
+    if not reranker.warm_up(wait=True):
+        sys.exit("Cross-encoder could not be loaded.")
+
+    results = {"vector": [], "reranked": []}
+    latencies = []
+    for item in fixture["questions"]:
+        question, relevant = item["question"], set(item["relevant"])
+        question_embedding = bi_encoder.encode(question, convert_to_tensor=True)
+        hits = util.semantic_search(question_embedding, sentence_embeddings, top_k=args.candidates)[0]
+        vector_order = [hit["corpus_id"] for hit in hits]
+
+        candidates = [sentences[i] for i in vector_order]
+        start = time.perf_counter()
+        kept = reranker.rerank(question, candidates, args.top_k, args.batch_size, args.budget)
+        latencies.append(time.perf_counter() - start)
+        reranked_order = [vector_order[candidates.index(chunk)] for chunk in kept]
+
+        for name, ranked in (("vector", vector_order), ("reranked", reranked_order)):
+            results[name].append((
+                precision_at_k(ranked, relevant, args.top_k),
+                reciprocal_rank(ranked[:args.top_k], relevant),
+            ))
+
+    print(f"{len(fixture['questions'])} questions, {len(sentences)} sentences, "
+          f"{args.candidates} candidates, top {args.top_k}, {args.budget:.2f}s budget")
+    for name, scores in results.items():
+        precision = statistics.mean(p for p, _ in scores)
+        mrr = statistics.mean(r for _, r in scores)
+        print(f"{name:>9}: precision@{args.top_k} {precision:.3f}  MRR@{args.top_k} {mrr:.3f}")
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(f"added latency: median {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {p95 * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
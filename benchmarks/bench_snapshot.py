@@ -0,0 +1,65 @@
+"""Compare snapshot size and restore time with a full re-ingest of URLs.
+
+For each URL the page is scraped, split and embedded into a collection
+(the work a new node would otherwise repeat), then exported as float32 and
+float16 snapshots and restored into a fresh collection.
+
+    python benchmarks/bench_snapshot.py URL [URL ...]
+
+Like webchat.py, this needs the `.env` credentials to import.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import chromadb_client, export_collection, import_collection  # noqa: E402
+from webchat import MiniLML6V2EmbeddingFunction, create_embedding  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", nargs="+")
+    args = parser.parse_args()
+
+    client = chromadb_client()
+    totals = {"ingest": 0.0, "float32": [0, 0.0], "float16": [0, 0.0]}
+    print(f"{'url':<50} {'records':>8} {'ingest s':>9} {'dtype':>8} {'KiB':>9} {'restore s':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for i, url in enumerate(args.urls):
+            collection_name = f"bench_snapshot_{i}"
+            start = time.perf_counter()
+            collection, _ = create_embedding(url, collection_name, client)
+            ingest = time.perf_counter() - start
+            totals["ingest"] += ingest
+
+            for dtype in ("float32", "float16"):
+                path = os.path.join(tmp_dir, f"{collection_name}.{dtype}.snapshot")
+                export_collection(collection_name, client, path, dtype=dtype)
+                restored_name = f"{collection_name}_{dtype}"
+                start = time.perf_counter()
+                import_collection(path, client, restored_name, embedding_function=MiniLML6V2EmbeddingFunction())
+                restore = time.perf_counter() - start
+                client.delete_collection(restored_name)
+
+                size = os.path.getsize(path)
+                totals[dtype][0] += size
+                totals[dtype][1] += restore
+                print(f"{url[:50]:<50} {collection.count():>8} {ingest:>9.2f} {dtype:>8} "
+                      f"{size / 1024:>9.1f} {restore:>10.3f}")
+            client.delete_collection(collection_name)
+
+    print()
+    print(f"re-ingest: {totals['ingest']:.2f}s")
+    for dtype in ("float32", "float16"):
+        size, restore = totals[dtype]
+        print(f"{dtype} snapshots: {size / 1024:.1f} KiB, restore {restore:.3f}s "
+              f"({totals['ingest'] / restore if restore else float('inf'):.0f}x faster than re-ingest)")
+
+
+if __name__ == "__main__":
+    main()
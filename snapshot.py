@@ -0,0 +1,60 @@
+"""Export indexed web pages to snapshot files, or inspect a snapshot.
+
+Snapshots let an index be built once and moved to another node instead of
+re-scraping and re-embedding every page there:
+
+    python snapshot.py export URL [URL ...] --out snapshots/ [--dtype float16]
+    python snapshot.py inspect snapshots/<collection>.snapshot
+
+Exported files can be loaded with "Import snapshot" in the app sidebar.
+"""
+import argparse
+import os
+
+from utils import chromadb_client, url_collection_name, export_collection, read_snapshot
+
+
+def export_urls(urls, out_dir, dtype):
+    """Index each URL and write its collection to `out_dir`."""
+    # webchat loads the embedding model and credentials on import
+    from webchat import create_embedding
+
+    os.makedirs(out_dir, exist_ok=True)
+    client = chromadb_client()
+    for url in urls:
+        collection_name = url_collection_name(url)
+        create_embedding(url, collection_name, client)
+        path = os.path.join(out_dir, f"{collection_name}.snapshot")
+        export_collection(collection_name, client, path, dtype=dtype)
+        print(f"{url} -> {path}")
+
+
+def inspect_snapshot(path):
+    """Print what a snapshot file contains."""
+    header, embeddings = read_snapshot(path)
+    print(f"collection: {header['name']}")
+    print(f"version:    {header.get('version')}")
+    print(f"records:    {len(header['ids'])}")
+    print(f"embeddings: {embeddings.shape} {header['dtype']}")
+    print(f"size:       {os.path.getsize(path) / 1024:.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect collection snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="index URLs and write one snapshot per collection")
+    export_parser.add_argument("urls", nargs="+")
+    export_parser.add_argument("--out", default="snapshots")
+    export_parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    inspect_parser = commands.add_parser("inspect", help="describe a snapshot file")
+    inspect_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_urls(args.urls, args.out, args.dtype)
+    else:
+        inspect_snapshot(args.path)
+
+
+if __name__ == "__main__":
+    main()
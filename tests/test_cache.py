@@ -0,0 +1,76 @@
+import utils
+
+
+class CountingCollection:
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+
+    def query(self, query_embeddings, n_results):
+        self.queries += 1
+        return {"documents": [[f"doc {i}" for i in range(n_results)]]}
+
+
+def embed(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def test_repeated_question_is_served_from_cache():
+    collection = CountingCollection("cache_hit")
+    utils.set_collection_version("cache_hit", "v1")
+    for _ in range(3):
+        assert utils.query_collection(collection, "q", 2, embed, "v1") == ["doc 0", "doc 1"]
+    assert collection.queries == 1
+
+
+def test_new_version_invalidates_cached_results():
+    collection = CountingCollection("cache_version")
+    utils.set_collection_version("cache_version", "v1")
+    utils.query_collection(collection, "q", 2, embed, "v1")
+    utils.set_collection_version("cache_version", "v2")
+    utils.query_collection(collection, "q", 2, embed, "v2")
+    assert collection.queries == 2
+
+
+def test_results_for_a_superseded_version_are_not_cached():
+    collection = CountingCollection("cache_stale")
+    utils.set_collection_version("cache_stale", "v2")
+    utils.query_collection(collection, "q", 2, embed, "v1")
+    utils.query_collection(collection, "q", 2, embed, "v1")
+    assert collection.queries == 2
+
+
+def test_clearing_a_collection_drops_its_entries():
+    collection = CountingCollection("cache_clear")
+    utils.set_collection_version("cache_clear", "v1")
+    utils.query_collection(collection, "q", 2, embed, "v1")
+    utils.invalidate_collection("cache_clear")
+    utils.set_collection_version("cache_clear", "v1")
+    utils.query_collection(collection, "q", 2, embed, "v1")
+    assert collection.queries == 2
+
+
+def test_query_embeddings_are_cached_per_embedding_function():
+    def embed_ones(texts):
+        return [[1.0] for _ in texts]
+
+    def embed_twos(texts):
+        return [[2.0] for _ in texts]
+
+    assert utils.embed_query("same question", embed_ones) == [1.0]
+    assert utils.embed_query("same question", embed_twos) == [2.0]
+    assert utils.embed_query("same question", embed_ones) == [1.0]
+
+
+def test_embedding_functions_sharing_a_model_share_cache_entries():
+    class SharedModelFunction:
+        MODEL = object()
+        calls = 0
+
+        def __call__(self, input):
+            SharedModelFunction.calls += 1
+            return [[3.0] for _ in input]
+
+    utils.embed_query("shared model", SharedModelFunction())
+    utils.embed_query("shared model", SharedModelFunction())
+    assert SharedModelFunction.calls == 1
@@ -0,0 +1,195 @@
+import os
+import uuid
+
+import chromadb
+import numpy as np
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def client():
+    return chromadb.EphemeralClient()
+
+
+def build_collection(client, name, rows=20):
+    collection = client.get_or_create_collection(name)
+    collection.upsert(
+        ids=[str(i) for i in range(rows)],
+        documents=[f"{name} sentence {i}" for i in range(rows)],
+        metadatas=[{"source": str(i)} for i in range(rows)],
+        embeddings=np.random.default_rng(0).random((rows, 8)).tolist(),
+    )
+    return collection
+
+
+def names(client):
+    return {c if isinstance(c, str) else c.name for c in client.list_collections()}
+
+
+def unique(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.mark.parametrize("url", [
+    "https://bbc.co.uk/news/world",
+    "https://x.ai",
+    "x.ai",
+    "http://localhost:8501/",
+    "",
+])
+def test_url_collection_names_are_valid_chroma_names(client, url):
+    name = utils.url_collection_name(url)
+    assert 3 <= len(name) <= 63
+    client.get_or_create_collection(name)
+
+
+def test_url_collection_names_are_unique_per_page():
+    assert utils.url_collection_name("https://bbc.co.uk/news") != utils.url_collection_name("https://bbc.co.uk/sport")
+    assert utils.url_collection_name("https://bbc.co.uk/news") != utils.url_collection_name("https://itv.co.uk/news")
+
+
+def test_url_collection_names_ignore_insignificant_differences():
+    name = utils.url_collection_name("https://bbc.co.uk/news")
+    assert utils.url_collection_name("HTTPS://BBC.co.uk:443/news/#top") == name
+    assert utils.url_collection_name("bbc.co.uk/news") == name
+    assert utils.url_collection_name("https://bbc.co.uk/news?page=2") != name
+
+
+def test_least_recently_used_collection_is_evicted_and_restored(client, tmp_path):
+    manager = utils.CollectionManager(client, max_vectors=50, snapshot_dir=str(tmp_path))
+    a, b, c = unique("a"), unique("b"), unique("c")
+    for name in (a, b, c):
+        manager.touch(name, build_collection(client, name))
+
+    assert a not in names(client) and {b, c} <= names(client)
+    assert manager.usage()["vectors"] == 40 and manager.usage()["snapshots"] == 1
+
+    restored = manager.restore(a)
+    assert restored.count() == 20
+    assert b not in names(client)
+
+
+def test_failed_snapshot_aborts_eviction(client, tmp_path, monkeypatch):
+    manager = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    a, b = unique("a"), unique("b")
+    manager.touch(a, build_collection(client, a))
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils.os, "replace", fail)
+    manager.touch(b, build_collection(client, b))
+
+    assert {a, b} <= names(client)
+    assert manager.usage()["snapshots"] == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_snapshots_from_an_earlier_process_are_restored(client, tmp_path):
+    first = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    a, b = unique("a"), unique("b")
+    first.touch(a, build_collection(client, a))
+    first.touch(b, build_collection(client, b))
+    (tmp_path / "leftover.snapshot.tmp").write_bytes(b"partial")
+
+    second = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    assert second.usage()["snapshots"] == 1
+    assert not (tmp_path / "leftover.snapshot.tmp").exists()
+    assert second.restore(a).count() == 20
+
+
+def test_oldest_snapshots_are_dropped_past_the_disk_budget(client, tmp_path):
+    manager = utils.CollectionManager(client, max_vectors=20, snapshot_dir=str(tmp_path))
+    created = [unique(f"c{i}") for i in range(3)]
+    for name in created:
+        manager.touch(name, build_collection(client, name))
+    snapshot_size = manager.usage()["snapshot_bytes"] // 2
+
+    manager.max_snapshot_bytes = snapshot_size
+    manager._enforce_snapshot_budget()
+    assert manager.usage()["snapshots"] == 1
+    assert manager.restore(created[0]) is None
+    assert manager.restore(created[1]).count() == 20
+
+
+def test_pinned_collections_are_not_evicted(client, tmp_path):
+    manager = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    a, b = unique("a"), unique("b")
+    manager.touch(a, build_collection(client, a))
+    with manager.pin(a):
+        manager.touch(b, build_collection(client, b))
+        assert {a, b} <= names(client)
+    manager.touch(b, client.get_collection(b))
+    assert a not in names(client)
+
+
+def test_snapshot_copied_in_while_running_is_restored(client, tmp_path):
+    manager = utils.CollectionManager(client, snapshot_dir=str(tmp_path))
+    name = unique("copied")
+    build_collection(client, name)
+    utils.export_collection(name, client, manager._snapshot_path(name))
+    client.delete_collection(name)
+
+    assert manager.restore(name).count() == 20
+
+
+@pytest.mark.parametrize("url", ["localhost:abc", "example.com:99999", "http://[::1"])
+def test_malformed_urls_still_get_valid_names(client, url):
+    name = utils.url_collection_name(url)
+    assert name == utils.url_collection_name(url)
+    client.get_or_create_collection(name)
+
+
+def test_clear_deletes_live_collections(client, tmp_path):
+    manager = utils.CollectionManager(client, snapshot_dir=str(tmp_path))
+    name = unique("live")
+    manager.touch(name, build_collection(client, name))
+
+    assert manager.clear(name)
+    assert name not in names(client)
+    assert manager.usage()["collections"] == 0
+
+
+def test_clear_removes_evicted_snapshots(client, tmp_path):
+    manager = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    a, b = unique("a"), unique("b")
+    manager.touch(a, build_collection(client, a))
+    manager.touch(b, build_collection(client, b))
+
+    assert manager.clear(a)
+    assert os.listdir(tmp_path) == []
+    assert manager.restore(a) is None
+
+
+def test_clear_treats_missing_collections_as_cleared(client, tmp_path):
+    manager = utils.CollectionManager(client, snapshot_dir=str(tmp_path))
+    assert manager.clear(unique("never_indexed"))
+
+
+def test_clear_leaves_pinned_collections_alone(client, tmp_path):
+    manager = utils.CollectionManager(client, snapshot_dir=str(tmp_path))
+    name = unique("pinned")
+    manager.touch(name, build_collection(client, name))
+    with manager.pin(name):
+        assert not manager.clear(name)
+    assert name in names(client)
+
+
+def test_stale_snapshot_does_not_overwrite_a_newer_import(client, tmp_path):
+    manager = utils.CollectionManager(client, max_vectors=30, snapshot_dir=str(tmp_path))
+    a, b = unique("a"), unique("b")
+    manager.touch(a, build_collection(client, a, rows=20))
+    manager.touch(b, build_collection(client, b))
+    assert a not in names(client)
+
+    build_collection(client, a, rows=5)
+    newer_path = str(tmp_path / "newer.bin")
+    utils.export_collection(a, client, newer_path)
+    client.delete_collection(a)
+
+    manager.import_snapshot(newer_path)
+    assert not os.path.exists(manager._snapshot_path(a))
+    assert manager.restore(a) is None
+    assert client.get_collection(a).count() == 5
@@ -0,0 +1,101 @@
+import time
+
+import utils
+
+
+class ScoreArray(list):
+    def tolist(self):
+        return list(self)
+
+
+class LengthScorer:
+    """Scores a chunk by its length, sleeping `seconds_per_pair` per pair."""
+
+    def __init__(self, seconds_per_pair=0.0):
+        self.seconds_per_pair = seconds_per_pair
+        self.batch_sizes = []
+
+    def predict(self, pairs, batch_size):
+        self.batch_sizes.append(len(pairs))
+        time.sleep(self.seconds_per_pair * len(pairs))
+        return ScoreArray(float(len(chunk)) for _, chunk in pairs)
+
+
+def loaded_reranker(model):
+    reranker = utils.CrossEncoderReranker(loader=lambda: model)
+    assert reranker.warm_up(wait=True)
+    return reranker
+
+
+CHUNKS = ["a", "ccc", "bb", "dddd", "eeeee", "f"]
+
+
+def test_rerank_orders_by_cross_encoder_score():
+    reranker = loaded_reranker(LengthScorer())
+    assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == ["eeeee", "dddd", "ccc"]
+
+
+def test_budget_keeps_scored_prefix_and_vector_order_for_the_rest():
+    model = LengthScorer(seconds_per_pair=0.02)
+    reranker = loaded_reranker(model)
+    start = time.perf_counter()
+    result = reranker.rerank("q", CHUNKS, top_k=6, batch_size=16, time_budget=0.07)
+    elapsed = time.perf_counter() - start
+
+    scored = sum(model.batch_sizes[1:])
+    assert 0 < scored < len(CHUNKS)
+    assert result[:scored] == sorted(CHUNKS[:scored], key=len, reverse=True)
+    assert result[scored:] == CHUNKS[scored:]
+    assert elapsed < 0.07 + 0.05
+
+
+def test_batches_are_sized_to_the_remaining_budget():
+    model = LengthScorer(seconds_per_pair=0.01)
+    reranker = loaded_reranker(model)
+    reranker.rerank("q", CHUNKS * 4, top_k=5, batch_size=16, time_budget=0.05)
+    assert all(size <= 5 for size in model.batch_sizes[1:])
+
+
+def test_vector_order_until_the_model_is_loaded():
+    reranker = utils.CrossEncoderReranker(loader=lambda: time.sleep(0.2) or LengthScorer())
+    assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == CHUNKS[:3]
+    reranker.warm_up(wait=True)
+    assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == ["eeeee", "dddd", "ccc"]
+
+
+def test_unavailable_model_falls_back_to_vector_order():
+    def missing():
+        raise OSError("model not found")
+
+    reranker = utils.CrossEncoderReranker(loader=missing)
+    assert not reranker.warm_up(wait=True)
+    assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == CHUNKS[:3]
+
+
+def test_any_load_error_falls_back_to_vector_order():
+    def broken_install():
+        raise ImportError("torch is not installed")
+
+    reranker = utils.CrossEncoderReranker(loader=broken_install)
+    assert not reranker.warm_up(wait=True)
+    for _ in range(2):
+        assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == CHUNKS[:3]
+
+
+def test_first_batch_is_small_even_with_an_optimistic_estimate():
+    model = LengthScorer(seconds_per_pair=0.01)
+    reranker = loaded_reranker(model)
+    reranker.seconds_per_pair = 1e-9
+    reranker.rerank("q", CHUNKS * 4, top_k=5, batch_size=16, time_budget=1.0)
+    assert model.batch_sizes[1] == utils.CrossEncoderReranker.FIRST_BATCH_SIZE
+
+
+def test_instant_model_does_not_divide_by_zero():
+    class InstantScorer(LengthScorer):
+        def predict(self, pairs, batch_size):
+            return ScoreArray(float(len(chunk)) for _, chunk in pairs)
+
+    reranker = loaded_reranker(InstantScorer())
+    assert reranker.seconds_per_pair > 0
+    reranker.seconds_per_pair = 0.0
+    assert reranker.rerank("q", CHUNKS, top_k=3, batch_size=4, time_budget=1.0) == ["eeeee", "dddd", "ccc"]
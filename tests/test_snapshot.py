@@ -0,0 +1,96 @@
+import chromadb
+import numpy as np
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def client():
+    client = chromadb.EphemeralClient()
+    yield client
+    for collection in client.list_collections():
+        client.delete_collection(collection.name if hasattr(collection, "name") else collection)
+
+
+def build_collection(client, name, rows=23, dimension=8):
+    documents = [f"sentence {i}" for i in range(rows)]
+    collection = client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+    collection.upsert(
+        ids=[str(i) for i in range(rows)],
+        documents=documents,
+        metadatas=[{"source": str(i)} for i in range(rows)],
+        embeddings=np.random.default_rng(0).random((rows, dimension)).tolist(),
+    )
+    utils.set_collection_version(name, utils.documents_fingerprint(documents))
+    return collection
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_round_trip_restores_records_and_version(client, tmp_path, dtype):
+    source = build_collection(client, "snapshot_source")
+    path = str(tmp_path / "source.snapshot")
+    utils.export_collection("snapshot_source", client, path, dtype=dtype, batch_size=5)
+
+    header, embeddings = utils.read_snapshot(path)
+    assert isinstance(embeddings, np.memmap)
+    assert embeddings.shape == (23, 8) and embeddings.dtype == dtype
+
+    restored = utils.import_collection(path, client, "snapshot_restored", batch_size=7)
+    original = source.get(ids=["5"], include=["documents", "metadatas", "embeddings"])
+    copy = restored.get(ids=["5"], include=["documents", "metadatas", "embeddings"])
+    assert restored.count() == 23
+    assert copy["documents"] == original["documents"]
+    assert copy["metadatas"] == original["metadatas"]
+    assert np.allclose(copy["embeddings"], original["embeddings"], atol=1e-3)
+    assert utils.get_collection_version("snapshot_restored") == utils.get_collection_version("snapshot_source")
+
+
+def test_float16_snapshot_is_about_half_the_size(client, tmp_path):
+    build_collection(client, "snapshot_sizes", rows=200, dimension=384)
+    utils.export_collection("snapshot_sizes", client, str(tmp_path / "32"), dtype="float32")
+    utils.export_collection("snapshot_sizes", client, str(tmp_path / "16"), dtype="float16")
+    size32 = (tmp_path / "32").stat().st_size
+    size16 = (tmp_path / "16").stat().st_size
+    assert size16 < 0.6 * size32
+
+
+def test_rejects_files_that_are_not_snapshots(tmp_path):
+    path = tmp_path / "bogus"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        utils.read_snapshot(str(path))
+
+
+def test_fingerprint_tolerates_missing_documents():
+    assert utils.documents_fingerprint(["a", None]) == utils.documents_fingerprint(["a", ""])
+
+
+def test_import_replaces_rows_missing_from_the_snapshot(client, tmp_path):
+    build_collection(client, "snapshot_small", rows=2)
+    path = str(tmp_path / "small.snapshot")
+    utils.export_collection("snapshot_small", client, path)
+
+    build_collection(client, "snapshot_target", rows=4)
+    restored = utils.import_collection(path, client, "snapshot_target")
+    assert sorted(restored.get()["ids"]) == ["0", "1"]
+
+
+def test_import_batches_are_capped_by_the_client(client, tmp_path, monkeypatch):
+    build_collection(client, "snapshot_batches", rows=10)
+    path = str(tmp_path / "batches.snapshot")
+    utils.export_collection("snapshot_batches", client, path)
+
+    collection_type = type(client.get_collection("snapshot_batches"))
+    upsert = collection_type.upsert
+    batch_sizes = []
+
+    def recording_upsert(self, ids, **kwargs):
+        batch_sizes.append(len(ids))
+        return upsert(self, ids=ids, **kwargs)
+
+    monkeypatch.setattr(collection_type, "upsert", recording_upsert)
+    monkeypatch.setattr(client, "get_max_batch_size", lambda: 3)
+    restored = utils.import_collection(path, client, "snapshot_batched", batch_size=5000)
+    assert restored.count() == 10
+    assert batch_sizes == [3, 3, 3, 1]
@@ -1,6 +1,15 @@
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse
+from contextlib import contextmanager
+from collections import OrderedDict
 from dotenv import load_dotenv
 import os
+import re
+import time
+import hashlib
+import inspect
+import json
+import struct
+import threading
 import chromadb
 import logging
 
@@ -52,6 +61,32 @@ def create_collection_name(url):
         logger.warning(f"Invalid URL '{url}': {e}")
         return "invalid_url"
 
+def url_collection_name(url):
+    """Create a valid collection name that is unique per normalized URL.
+
+    The name is the host followed by a hash of the URL, so pages on the same
+    site get separate collections and short hosts still meet ChromaDB's
+    3-63 character rule.
+    """
+    url = url.strip()
+    try:
+        parsed_url = urlparse(url if "://" in url else f"https://{url}")
+        scheme = parsed_url.scheme.lower()
+        host = (parsed_url.hostname or "").lower()
+        port = parsed_url.port
+    except ValueError as e:
+        # Malformed input such as a bad port still gets a stable, valid name
+        logger.warning(f"Invalid URL '{url}': {e}")
+        return f"url-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}"
+    netloc = host if port is None or (scheme, port) in (("http", 80), ("https", 443)) else f"{host}:{port}"
+    path = parsed_url.path.rstrip("/") or "/"
+    normalized = urlunparse((scheme, netloc, path, parsed_url.params, parsed_url.query, ""))
+
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+    prefix = re.sub(r"\.{2,}", ".", re.sub(r"[^a-z0-9.-]", "-", host))[:40]
+    prefix = re.sub(r"^[^a-z0-9]+", "", prefix)
+    return f"{prefix}-{digest}" if prefix else f"url-{digest}"
+
 def chromadb_client():
     """Initialize a ChromaDB client with custom cache settings."""
     from chromadb.config import Settings
@@ -66,14 +101,626 @@ def chromadb_client():
     except Exception as e:
         raise RuntimeError(f"Failed to initialize ChromaDB client: {e}")
 
+def collection_exists(collection_name, client):
+    """Check whether a collection is currently held by the client."""
+    for collection in client.list_collections():
+        # Older chromadb releases list names, newer ones Collection objects
+        name = collection if isinstance(collection, str) else collection.name
+        if name == collection_name:
+            return True
+    return False
+
 def clear_collection(collection_name, client):
     """Clear a specific collection in ChromaDB."""
-    try:
-        collection = client.get_collection(collection_name)
-        if collection:
-            collection.delete()
-            logger.info(f"Collection '{collection_name}' cleared successfully!")
-    except ValueError:
+    invalidate_collection(collection_name)
+    if not collection_exists(collection_name, client):
         logger.warning(f"Collection '{collection_name}' does not exist, skipping.")
+        return
+    try:
+        client.delete_collection(collection_name)
+        logger.info(f"Collection '{collection_name}' cleared successfully!")
     except Exception as e:
         logger.error(f"Failed to clear collection '{collection_name}': {e}")
+
+
+class LRUCache:
+    """A small thread-safe LRU cache that tracks hit rate and time saved."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value, cost = entry
+            self.seconds_saved += cost
+            return value
+
+    def put(self, key, value, cost=0.0):
+        """Store `value`; `cost` is the time in seconds it took to compute."""
+        with self._lock:
+            self._entries[key] = (value, cost)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key matches `predicate`."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self):
+        """Return hit/miss counters and the total time saved by hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "seconds_saved": self.seconds_saved,
+            }
+
+
+# In-process caches shared by every request served by this process
+query_embedding_cache = LRUCache(max_size=512)
+retrieval_cache = LRUCache(max_size=256)
+_collection_versions = {}
+_collection_versions_lock = threading.Lock()
+
+
+def documents_fingerprint(documents):
+    """Hash a list of documents so unchanged content can be detected."""
+    digest = hashlib.sha1()
+    for document in documents:
+        digest.update((document or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_collection_version(collection_name):
+    """Return the content fingerprint last upserted into a collection."""
+    with _collection_versions_lock:
+        return _collection_versions.get(collection_name)
+
+
+def set_collection_version(collection_name, version):
+    """Record a new collection version, dropping stale retrieval results."""
+    with _collection_versions_lock:
+        if _collection_versions.get(collection_name) == version:
+            return
+        _collection_versions[collection_name] = version
+        retrieval_cache.invalidate(lambda key: key[0] == collection_name)
+
+
+def invalidate_collection(collection_name):
+    """Forget the version and cached results of a cleared collection."""
+    with _collection_versions_lock:
+        _collection_versions.pop(collection_name, None)
+        retrieval_cache.invalidate(lambda key: key[0] == collection_name)
+
+
+def embedding_function_key(embedding_function):
+    """Identify the model behind an embedding function for use in cache keys."""
+    model = getattr(embedding_function, "MODEL", None)
+    if model is not None:
+        return model
+    if inspect.isroutine(embedding_function):
+        return embedding_function
+    return type(embedding_function)
+
+
+def embed_query(question, embedding_function):
+    """Embed a question, reusing the cached vector for repeated questions."""
+    key = (embedding_function_key(embedding_function), question)
+    embedding = query_embedding_cache.get(key)
+    if embedding is None:
+        start = time.perf_counter()
+        embedding = embedding_function([question])[0]
+        query_embedding_cache.put(key, embedding, cost=time.perf_counter() - start)
+    return embedding
+
+
+def query_collection(collection, question, n_results, embedding_function, version):
+    """Return the documents closest to `question`, served from cache when possible.
+
+    `version` is the collection version the caller just built or verified;
+    results are only cached while it is still the current version.
+    """
+    key = (collection.name, version, question, n_results, embedding_function_key(embedding_function))
+    documents = retrieval_cache.get(key)
+    if documents is None:
+        start = time.perf_counter()
+        embedding = embed_query(question, embedding_function)
+        result = collection.query(query_embeddings=[embedding], n_results=n_results)
+        documents = result["documents"][0]
+        with _collection_versions_lock:
+            if _collection_versions.get(collection.name) == version:
+                retrieval_cache.put(key, documents, cost=time.perf_counter() - start)
+    return documents
+
+
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Re-ranking settings shared by every entry point. `batch_size` is an upper
+# bound; batches are shrunk to fit whatever is left of `time_budget`.
+RERANK_PARAMS = {
+    "candidates": 20,
+    "top_k": 5,
+    "batch_size": 16,
+    "time_budget": 0.5,
+}
+
+
+class CrossEncoderReranker:
+    """Re-rank retrieved chunks with a cross-encoder under a time budget.
+
+    The model is loaded in a background thread by `warm_up()` so the
+    download and load never count against a request. Until it is ready,
+    or if it fails to load, chunks are returned in their vector-search order.
+    """
+
+    # A question and a sentence of typical length, used to time the model
+    CALIBRATION_PAIR = (
+        "What are the main tasks that natural language processing models are used for?",
+        "Common tasks include classifying whole sentences, classifying each word in a sentence, "
+        "generating text content, extracting an answer from a text and generating a new sentence "
+        "from an input text, such as a translation or a summary of a longer document.",
+    )
+    # Each request starts with a small batch so a stale timing estimate
+    # cannot size the first batch past the budget
+    FIRST_BATCH_SIZE = 2
+    MIN_SECONDS_PER_PAIR = 1e-4
+
+    def __init__(self, model_name=RERANK_MODEL_NAME, loader=None):
+        self.model_name = model_name
+        self._loader = loader or self._load_cross_encoder
+        self._model = None
+        self._failed = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self.seconds_per_pair = None
+
+    def _load_cross_encoder(self):
+        from sentence_transformers import CrossEncoder
+
+        # Downloads go to HF_HOME, which the entry points point at .cache
+        return CrossEncoder(self.model_name, device="cpu")
+
+    @property
+    def ready(self):
+        return self._model is not None
+
+    def warm_up(self, wait=False):
+        """Start loading the model in the background; optionally wait for it."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="rerank-warm-up", daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if wait:
+            thread.join()
+        return self.ready
+
+    def _load(self):
+        try:
+            model = self._loader()
+            # Time a warm-up batch so the first request can size its batches
+            pairs = [self.CALIBRATION_PAIR] * 4
+            start = time.perf_counter()
+            model.predict(pairs, batch_size=len(pairs))
+            self.seconds_per_pair = max((time.perf_counter() - start) / len(pairs), self.MIN_SECONDS_PER_PAIR)
+            self._model = model
+            logger.info(f"Loaded cross-encoder '{self.model_name}'")
+        except Exception:
+            self._failed = True
+            logger.exception(f"Re-ranking unavailable, failed to load '{self.model_name}'")
+
+    def rerank(self, question, chunks, top_k, batch_size, time_budget):
+        """Return the `top_k` best chunks, scoring as many as fit in `time_budget`.
+
+        Chunks that could not be scored in time keep their vector-search
+        order after the re-ranked ones.
+        """
+        if len(chunks) <= 1 or self._failed:
+            return chunks[:top_k]
+        if not self.ready:
+            self.warm_up()
+            logger.info("Cross-encoder is not loaded yet, keeping vector order.")
+            return chunks[:top_k]
+
+        start = time.perf_counter()
+        scores = []
+        while len(scores) < len(chunks):
+            remaining = time_budget - (time.perf_counter() - start)
+            limit = batch_size if scores else min(batch_size, self.FIRST_BATCH_SIZE)
+            seconds_per_pair = max(self.seconds_per_pair, self.MIN_SECONDS_PER_PAIR)
+            size = min(limit, len(chunks) - len(scores), int(remaining / seconds_per_pair))
+            if size < 1:
+                break
+            batch = chunks[len(scores):len(scores) + size]
+            batch_start = time.perf_counter()
+            scores.extend(self._model.predict([(question, chunk) for chunk in batch], batch_size=size).tolist())
+            observed = (time.perf_counter() - batch_start) / size
+            self.seconds_per_pair = max(
+                observed, 0.8 * self.seconds_per_pair + 0.2 * observed, self.MIN_SECONDS_PER_PAIR
+            )
+
+        elapsed = time.perf_counter() - start
+        if len(scores) < len(chunks):
+            logger.warning(
+                f"Re-ranking budget of {time_budget:.2f}s allowed {len(scores)}/{len(chunks)} "
+                "chunks, keeping vector order for the rest."
+            )
+        else:
+            logger.info(f"Re-ranked {len(chunks)} chunks in {elapsed:.3f}s")
+        order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        reranked = [chunks[i] for i in order] + chunks[len(scores):]
+        return reranked[:top_k]
+
+
+reranker = CrossEncoderReranker()
+
+
+def retrieve_context(collection, question, version, embedding_function, rerank=False, params=RERANK_PARAMS):
+    """Retrieve the chunks used as prompt context, optionally re-ranked."""
+    if not rerank:
+        return query_collection(collection, question, params["top_k"], embedding_function, version)
+    candidates = query_collection(collection, question, params["candidates"], embedding_function, version)
+    return reranker.rerank(
+        question,
+        candidates,
+        top_k=params["top_k"],
+        batch_size=params["batch_size"],
+        time_budget=params["time_budget"],
+    )
+
+
+def cache_stats(log=False):
+    """Report hit rates and latency saved by the query caches."""
+    stats = {
+        "query_embeddings": query_embedding_cache.stats(),
+        "retrieval": retrieval_cache.stats(),
+    }
+    for name, values in stats.items():
+        if log:
+            logger.info(
+                f"{name} cache: {values['hits']} hits / {values['misses']} misses "
+                f"({values['hit_rate']:.0%}), {values['seconds_saved']:.3f}s saved"
+            )
+    return stats
+
+
+SNAPSHOT_MAGIC = b"CWUSNAP1"
+SNAPSHOT_ALIGNMENT = 64
+
+
+def export_collection(collection_name, client, path, dtype="float32", batch_size=5000):
+    """Export a collection's documents, metadata, ids and embeddings to a snapshot file.
+
+    The file holds a JSON header followed by an aligned, row-major embedding
+    matrix so it can be memory-mapped on import.
+    """
+    import numpy as np
+
+    if dtype not in ("float32", "float16"):
+        raise ValueError(f"Unsupported snapshot dtype '{dtype}'.")
+
+    start = time.perf_counter()
+    collection = client.get_collection(collection_name)
+    ids, documents, metadatas, embeddings = [], [], [], []
+    offset = 0
+    while True:
+        batch = collection.get(
+            include=["documents", "metadatas", "embeddings"],
+            limit=batch_size,
+            offset=offset,
+        )
+        if not batch["ids"]:
+            break
+        ids.extend(batch["ids"])
+        documents.extend(batch["documents"])
+        metadatas.extend(batch["metadatas"])
+        embeddings.append(np.asarray(batch["embeddings"], dtype=dtype))
+        offset += len(batch["ids"])
+
+    matrix = np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=dtype)
+    header = json.dumps({
+        "name": collection_name,
+        "version": get_collection_version(collection_name),
+        "metadata": collection.metadata,
+        "dtype": dtype,
+        "shape": list(matrix.shape),
+        "ids": ids,
+        "documents": documents,
+        "metadatas": metadatas,
+    }).encode("utf-8")
+
+    data_offset = len(SNAPSHOT_MAGIC) + 8 + len(header)
+    padding = -data_offset % SNAPSHOT_ALIGNMENT
+    # Write to a temporary file first so a failed export never leaves a
+    # partial snapshot at `path`
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(SNAPSHOT_MAGIC)
+            file.write(struct.pack("<Q", len(header)))
+            file.write(header)
+            file.write(b"\0" * padding)
+            file.write(np.ascontiguousarray(matrix).tobytes())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(
+        f"Exported {len(ids)} records from '{collection_name}' to '{path}' "
+        f"({os.path.getsize(path) / 1024:.1f} KiB, {time.perf_counter() - start:.2f}s)"
+    )
+    return path
+
+
+def read_snapshot(path):
+    """Read a snapshot header and memory-map its embedding matrix."""
+    import numpy as np
+
+    with open(path, "rb") as file:
+        if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"'{path}' is not a collection snapshot.")
+        (header_size,) = struct.unpack("<Q", file.read(8))
+        header = json.loads(file.read(header_size).decode("utf-8"))
+
+    data_offset = len(SNAPSHOT_MAGIC) + 8 + header_size
+    data_offset += -data_offset % SNAPSHOT_ALIGNMENT
+    shape = tuple(header["shape"])
+    if shape[0] == 0:
+        embeddings = np.empty(shape, dtype=header["dtype"])
+    else:
+        embeddings = np.memmap(path, dtype=header["dtype"], mode="r", offset=data_offset, shape=shape)
+    return header, embeddings
+
+
+def import_collection(path, client, collection_name=None, embedding_function=None, batch_size=5000):
+    """Bulk-load a snapshot file back into a ChromaDB collection."""
+    import numpy as np
+
+    start = time.perf_counter()
+    header, embeddings = read_snapshot(path)
+    collection_name = collection_name or header["name"]
+    kwargs = {"metadata": header["metadata"]} if header["metadata"] else {}
+    if embedding_function is not None:
+        kwargs["embedding_function"] = embedding_function
+    # Replace the collection outright so no rows outside the snapshot
+    # survive under the snapshot's version
+    if collection_exists(collection_name, client):
+        client.delete_collection(collection_name)
+    collection = client.create_collection(collection_name, **kwargs)
+
+    batch_size = min(batch_size, client.get_max_batch_size())
+    ids, documents, metadatas = header["ids"], header["documents"], header["metadatas"]
+    for i in range(0, len(ids), batch_size):
+        collection.upsert(
+            ids=ids[i:i + batch_size],
+            documents=documents[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size],
+            embeddings=np.asarray(embeddings[i:i + batch_size], dtype=np.float32).tolist(),
+        )
+    # Keep the version create_embedding recorded, so the restored
+    # collection is not re-embedded when its page is asked about again
+    version = header.get("version") or documents_fingerprint(documents)
+    set_collection_version(collection_name, version)
+
+    logger.info(
+        f"Imported {len(ids)} records into '{collection_name}' from '{path}' "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return collection
+
+
+class CollectionManager:
+    """Keep the indexed collections within a memory budget.
+
+    Tracks the size and last access time of each collection and evicts the
+    least recently used ones once the vector or byte budget is exceeded.
+    Collections pinned by an in-flight request are never evicted. With a
+    `snapshot_dir`, evicted collections are written to snapshot files and
+    reloaded on demand instead of being dropped; snapshots left by an
+    earlier process are picked up at startup, and the oldest ones are
+    deleted once they exceed `max_snapshot_bytes`.
+    """
+
+    def __init__(self, client, max_vectors=200_000, max_bytes=None, snapshot_dir=None,
+                 max_snapshot_bytes=1024 ** 3, bytes_per_vector=384 * 4 + 256, embedding_function=None):
+        self.client = client
+        self.max_vectors = max_vectors
+        self.max_bytes = max_bytes
+        self.snapshot_dir = snapshot_dir
+        self.max_snapshot_bytes = max_snapshot_bytes
+        self.bytes_per_vector = bytes_per_vector
+        self.embedding_function = embedding_function
+        self._collections = OrderedDict()
+        self._snapshots = {}
+        self._pins = {}
+        self._lock = threading.RLock()
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            self._load_snapshot_index()
+
+    def _snapshot_path(self, collection_name):
+        return os.path.join(self.snapshot_dir, f"{collection_name}.snapshot")
+
+    def _load_snapshot_index(self):
+        """Index snapshots written by an earlier process and drop leftovers."""
+        for file_name in os.listdir(self.snapshot_dir):
+            path = os.path.join(self.snapshot_dir, file_name)
+            if file_name.endswith(".snapshot"):
+                self._snapshots[file_name[:-len(".snapshot")]] = path
+            elif file_name.endswith(".snapshot.tmp"):
+                os.remove(path)
+        if self._snapshots:
+            logger.info(f"Found {len(self._snapshots)} collection snapshots in '{self.snapshot_dir}'")
+        self._enforce_snapshot_budget()
+
+    def _enforce_snapshot_budget(self):
+        """Delete the oldest snapshots until they fit in `max_snapshot_bytes`."""
+        if self.max_snapshot_bytes is None:
+            return
+        by_age = sorted(self._snapshots.items(), key=lambda item: os.path.getmtime(item[1]))
+        total = sum(os.path.getsize(path) for _, path in by_age)
+        for collection_name, path in by_age:
+            if total <= self.max_snapshot_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+            del self._snapshots[collection_name]
+            logger.info(f"Dropped snapshot of '{collection_name}' to stay within the disk budget")
+
+    @contextmanager
+    def pin(self, collection_name):
+        """Protect a collection from eviction while a request is using it."""
+        with self._lock:
+            self._pins[collection_name] = self._pins.get(collection_name, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[collection_name] -= 1
+                if not self._pins[collection_name]:
+                    del self._pins[collection_name]
+
+    def _discard_snapshot(self, collection_name):
+        """Delete any snapshot of a collection, indexed or copied in."""
+        path = self._snapshots.pop(collection_name, None)
+        if self.snapshot_dir:
+            path = path or self._snapshot_path(collection_name)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def restore(self, collection_name):
+        """Reload a collection from its snapshot if it was evicted."""
+        with self._lock:
+            if collection_exists(collection_name, self.client):
+                # The resident collection is newer than any snapshot of it
+                self._discard_snapshot(collection_name)
+                return None
+            path = self._snapshots.get(collection_name)
+            if path is None and self.snapshot_dir:
+                # Pick up snapshots copied into the directory while running
+                candidate = self._snapshot_path(collection_name)
+                if os.path.exists(candidate):
+                    path = self._snapshots[collection_name] = candidate
+            if path is None:
+                return None
+            try:
+                collection = import_collection(
+                    path, self.client, collection_name, embedding_function=self.embedding_function
+                )
+            except Exception as e:
+                logger.error(f"Failed to restore collection '{collection_name}' from '{path}': {e}")
+                return None
+            del self._snapshots[collection_name]
+            os.remove(path)
+            self.touch(collection_name, collection)
+            return collection
+
+    def touch(self, collection_name, collection):
+        """Record an access to a collection and enforce the memory budget."""
+        with self._lock:
+            self._discard_snapshot(collection_name)
+            vectors = collection.count()
+            self._collections[collection_name] = {
+                "vectors": vectors,
+                "bytes": vectors * self.bytes_per_vector,
+                "last_access": time.time(),
+            }
+            self._collections.move_to_end(collection_name)
+            self._enforce_budget(keep=collection_name)
+
+    def import_snapshot(self, path):
+        """Load a snapshot file, replacing any resident or evicted copy of it."""
+        with self._lock:
+            collection = import_collection(path, self.client, embedding_function=self.embedding_function)
+            self.touch(collection.name, collection)
+            return collection
+
+    def clear(self, collection_name):
+        """Delete a collection from memory and disk and stop tracking it.
+
+        A collection that does not exist counts as already cleared. Returns
+        False, leaving the collection in place, if a request is using it.
+        """
+        with self._lock:
+            if collection_name in self._pins:
+                return False
+            clear_collection(collection_name, self.client)
+            self._discard_snapshot(collection_name)
+            self._collections.pop(collection_name, None)
+            return True
+
+    def _over_budget(self):
+        usage = self.usage()
+        if self.max_vectors is not None and usage["vectors"] > self.max_vectors:
+            return True
+        return self.max_bytes is not None and usage["bytes"] > self.max_bytes
+
+    def _enforce_budget(self, keep):
+        for collection_name in list(self._collections):
+            if not self._over_budget():
+                break
+            if collection_name != keep:
+                self.evict(collection_name)
+
+    def evict(self, collection_name):
+        """Drop a collection from memory, snapshotting it first if configured.
+
+        Returns False, leaving the collection in place, if it is pinned or
+        its snapshot could not be written.
+        """
+        with self._lock:
+            if collection_name in self._pins:
+                return False
+            if self.snapshot_dir:
+                path = self._snapshot_path(collection_name)
+                try:
+                    export_collection(collection_name, self.client, path)
+                except Exception as e:
+                    logger.error(f"Failed to snapshot collection '{collection_name}', not evicting it: {e}")
+                    return False
+                self._snapshots[collection_name] = path
+                self._enforce_snapshot_budget()
+            try:
+                self.client.delete_collection(collection_name)
+            except Exception as e:
+                logger.warning(f"Failed to delete collection '{collection_name}', skipping: {e}")
+            invalidate_collection(collection_name)
+            info = self._collections.pop(collection_name, None)
+            logger.info(
+                f"Evicted collection '{collection_name}' "
+                f"({info['vectors'] if info else 0} vectors)"
+            )
+            return True
+
+    def usage(self):
+        """Report how many collections, vectors and bytes are held in memory and on disk."""
+        with self._lock:
+            return {
+                "collections": len(self._collections),
+                "vectors": sum(info["vectors"] for info in self._collections.values()),
+                "bytes": sum(info["bytes"] for info in self._collections.values()),
+                "snapshots": len(self._snapshots),
+                "snapshot_bytes": sum(
+                    os.path.getsize(path) for path in self._snapshots.values() if os.path.exists(path)
+                ),
+            }
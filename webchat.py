@@ -9,7 +9,15 @@ import requests
 from bs4 import BeautifulSoup
 import spacy
 import chromadb
-from utils import chromadb_client
+from utils import (
+    chromadb_client,
+    documents_fingerprint,
+    get_collection_version,
+    set_collection_version,
+    retrieve_context,
+    reranker,
+    cache_stats,
+)
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -47,8 +55,8 @@ embedding_model = SentenceTransformer(MODEL_NAME, cache_folder=CACHE_DIR)
 class MiniLML6V2EmbeddingFunction(EmbeddingFunction):
     MODEL = embedding_model
 
-    def __call__(self, texts):
-        return MiniLML6V2EmbeddingFunction.MODEL.encode(texts).tolist()
+    def __call__(self, input):
+        return MiniLML6V2EmbeddingFunction.MODEL.encode(input).tolist()
 
 
 def get_model(params):
@@ -91,24 +99,39 @@ def split_text_into_sentences(text):
 
 
 def create_embedding(url, collection_name, client):
-    """Create embeddings for the text scraped from a URL."""
+    """Create embeddings for the text scraped from a URL.
+
+    Returns the collection and the content version it was built from.
+    """
     text = extract_text(url)
     sentences = split_text_into_sentences(text)
-    collection = client.get_or_create_collection(collection_name)
-    collection.upsert(
-        documents=sentences,
-        metadatas=[{"source": str(i)} for i in range(len(sentences))],
-        ids=[str(i) for i in range(len(sentences))],
+    collection = client.get_or_create_collection(
+        collection_name, embedding_function=MiniLML6V2EmbeddingFunction()
     )
-    return collection
+    # Skip re-embedding when the page content has not changed
+    version = documents_fingerprint(sentences)
+    if get_collection_version(collection_name) != version:
+        # Drop sentences left over from a longer earlier version of the page
+        stale_ids = [str(i) for i in range(len(sentences), collection.count())]
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+        collection.upsert(
+            documents=sentences,
+            metadatas=[{"source": str(i)} for i in range(len(sentences))],
+            ids=[str(i) for i in range(len(sentences))],
+        )
+        set_collection_version(collection_name, version)
+    return collection, version
 
 
-def create_prompt(url, question, collection_name, client):
+def create_prompt(url, question, collection_name, client, rerank=False):
     """Generate a prompt using the embedded collection."""
     try:
-        collection = create_embedding(url, collection_name, client)
-        relevant_chunks = collection.query(query_texts=[question], n_results=5)
-        context = "\n\n\n".join(relevant_chunks["documents"][0])
+        collection, version = create_embedding(url, collection_name, client)
+        relevant_chunks = retrieve_context(
+            collection, question, version, MiniLML6V2EmbeddingFunction(), rerank
+        )
+        context = "\n\n\n".join(relevant_chunks)
         prompt = (
             "<|begin_of_text|>\n"
             "<|start_header_id|>system<|end_header_id|>\n"
@@ -128,10 +151,14 @@ def create_prompt(url, question, collection_name, client):
         raise RuntimeError(f"Error creating prompt: {e}")
 
 
-def answer_questions_from_web(url, question, collection_name, client):
+def answer_questions_from_web(url, question, collection_name, client, rerank=False):
     """Answer questions by querying WatsonX with relevant context."""
     model = get_model(MODEL_PARAMS)
-    prompt = create_prompt(url, question, collection_name, client)
+    if rerank:
+        # Load the cross-encoder up front so its load time is not taken
+        # out of the re-ranking budget
+        reranker.warm_up(wait=True)
+    prompt = create_prompt(url, question, collection_name, client, rerank)
     generated_response = model.generate(prompt=prompt)
     return generated_response["results"][0]["generated_text"].strip()
 
@@ -145,6 +172,7 @@ def main():
     response = answer_questions_from_web(url, question, collection_name, client)
     print("Generated Response:")
     print(response)
+    cache_stats(log=True)
 
 
 if __name__ == "__main__":